@@ -0,0 +1,84 @@
+#Arrival sources for manufacturing.Simulation
+#A source is an iterator of (time, Product), the simulation only pulls the next one when the previous one arrives,
+#so the event queue never holds more than one future arrival
+#Sources keep their position as plain attributes, so they can be pickled with a simulation checkpoint
+import csv
+
+from manufacturing import Product
+from rng import RandomStream
+
+class PoissonArrivals:
+    #Orders arrive with exponential gaps, rate is orders per minute
+    def __init__(self, rate, count=None, start=0, first_id=0, rng=None):
+        self.rate = rate
+        self.count = count #None means orders keep coming forever
+        self.time = start
+        self.next_id = first_id
+        self.last_id = None if count is None else first_id + count
+        self.rng = rng #If None, the simulation gives its own random stream when the source is added
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.next_id == self.last_id:
+            raise StopIteration
+        if self.rng is None:
+            self.rng = RandomStream()
+        self.time += self.rng.expovariate(self.rate)
+        self.next_id += 1
+        return self.time, Product(self.next_id - 1)
+
+class FixedIntervalArrivals:
+    #One order every interval minutes, the first one at start
+    def __init__(self, interval, count=None, start=0, first_id=0):
+        self.interval = interval
+        self.start = start
+        self.first_id = first_id
+        self.next_id = first_id
+        self.last_id = None if count is None else first_id + count
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.next_id == self.last_id:
+            raise StopIteration
+        n = self.next_id - self.first_id
+        self.next_id += 1
+        return self.start + n * self.interval, Product(self.next_id - 1)
+
+class FileArrivals:
+    #Replaying an order file, a CSV with a 'time' column and an optional 'id' column, sorted by time
+    #The file is read one line at a time, and only the offset is saved when the source is pickled
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, newline='')
+        self.fields = next(csv.reader([self.file.readline()]))
+        self.row = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.file.readline()
+        if not line.strip():
+            self.file.close()
+            raise StopIteration
+        row = dict(zip(self.fields, next(csv.reader([line]))))
+        self.row += 1
+        return float(row['time']), Product(int(row['id']) if row.get('id') else self.row - 1)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['file'] = self.file.tell() if not self.file.closed else None
+        return state
+
+    def __setstate__(self, state):
+        offset = state['file']
+        self.__dict__.update(state)
+        self.file = open(self.path, newline='')
+        if offset is None:
+            self.file.close()
+        else:
+            self.file.seek(offset)
@@ -0,0 +1,33 @@
+#Regression benchmark for the event core of manufacturing.Simulation
+#It measures raw events per second through Simulation.run, with handlers that only reschedule themselves,
+#so the numbers show the cost of the heap and the dispatch, not the cost of the factory logic
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from manufacturing import Simulation, START_PROCESS, END_PROCESS
+
+def bench_event_core(num_events=2_000_000, live_events=10_000):
+    sim = Simulation(0, 0, 8 * 60, float('inf'))
+    remaining = [num_events]
+    schedule = sim.schedule_event
+
+    def reschedule(product, machine, operator): #Every event schedules one more until we processed num_events
+        remaining[0] -= 1
+        if remaining[0] > live_events:
+            schedule(sim.clock + 1.0, END_PROCESS, product)
+
+    sim.handlers = [reschedule, reschedule]
+    for i in range(live_events): #Keeping the heap at a realistic size
+        sim.schedule_event(i * 0.001, START_PROCESS, i)
+
+    start = time.perf_counter()
+    sim.run()
+    elapsed = time.perf_counter() - start
+    return num_events / elapsed
+
+if __name__ == "__main__":
+    rate = bench_event_core()
+    print(f"event core: {rate:,.0f} events/sec")
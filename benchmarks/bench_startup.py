@@ -0,0 +1,44 @@
+#Startup budget for a bare import of every simulation module
+#Each import runs in a fresh interpreter, we take the median over several runs and subtract the cost of starting Python itself
+#Prints one JSON object, and exits with 1 if a module is over its budget
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+#Milliseconds on top of a bare interpreter, the elections modules need NumPy so their budget includes it
+BUDGETS_MS = {
+    'manufacturing': 60,
+    'dice': 40,
+    'election_sim': 250,
+    'elections': 250,
+    'elections_final': 250,
+}
+
+def time_command(code, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+def main(repeats=7):
+    baseline = time_command('pass', repeats)
+    results = {}
+    for module, budget in BUDGETS_MS.items():
+        cost = time_command(f'import {module}', repeats) - baseline
+        #Heavy optional packages must not be pulled in by a bare import
+        leaked = subprocess.run([sys.executable, '-c', f'import sys, {module}; print("pandas" in sys.modules)'],
+                                cwd=ROOT, check=True, capture_output=True, text=True).stdout.strip() == 'True'
+        results[module] = {'import_ms': round(cost, 1), 'budget_ms': budget, 'imports_pandas': leaked,
+                           'ok': cost <= budget and not leaked}
+    print(json.dumps({'baseline_ms': round(baseline, 1), 'modules': results}, indent=2))
+    return 0 if all(r['ok'] for r in results.values()) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#Reproducible benchmark suite for the simulators, for regression tracking
+#Every case runs in a fresh interpreter with a fixed seed, and reports throughput and peak memory (max RSS) as one JSON line
+#  python benchmarks/run_benchmarks.py                  full suite, results on stdout
+#  python benchmarks/run_benchmarks.py --quick -o out.jsonl
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+#(suite, parameters) pairs, each list scales one dimension while the others stay fixed
+MANUFACTURING_CASES = (
+    [{'products': n, 'machines': 20, 'operators': 60} for n in (1_000, 10_000, 100_000)]
+    + [{'products': 10_000, 'machines': m, 'operators': 3 * m} for m in (5, 50, 500)]
+)
+ELECTIONS_CASES = (
+    [{'years': 200, 'scale': s} for s in (1, 100, 1_000)] #scale multiplies every office and the yearly influx, so the pool grows
+    + [{'years': y, 'scale': 1} for y in (1_000, 10_000)]
+)
+QUICK_MANUFACTURING = [{'products': 1_000, 'machines': 20, 'operators': 60}]
+QUICK_ELECTIONS = [{'years': 200, 'scale': 1}, {'years': 200, 'scale': 100}]
+
+def run_manufacturing(params, seed):
+    from manufacturing import Simulation, Product
+    sim = Simulation(params['machines'], params['operators'], 8 * 60, float('inf'), seed=seed)
+    for i in range(params['products']):
+        sim.add_product(Product(i))
+    profiler = sim.enable_profiling()
+    sim.run()
+    report = profiler.report()
+    return {'events': report['events'], 'seconds': report['wall_seconds'], 'events_per_sec': report['events_per_sec'],
+            'heap_high_water': report['heap_high_water'], 'per_event': report['per_event']}
+
+def run_elections(params, seed):
+    from election_sim import ElectionSimulation, office_places, new_mean, new_std
+    scale = params['scale']
+    sim = ElectionSimulation(seed=seed, office_places={office: n * scale for office, n in office_places.items()},
+                             influx_mean=new_mean * scale, influx_std=new_std * scale ** 0.5)
+    profiler = sim.enable_profiling()
+    sim.run(params['years'])
+    report = profiler.report()
+    return {'years': report['years'], 'seconds': report['wall_seconds'], 'years_per_sec': report['years_per_sec'],
+            'pool_size_max': report['pool_size_max'], 'per_phase': report['per_phase'], 'PSI': sim.PSI}
+
+SUITES = {'manufacturing': run_manufacturing, 'elections': run_elections}
+
+def run_case(suite, params, seed):
+    #Runs inside the child process
+    result = SUITES[suite](params, seed)
+    #ru_maxrss is in kilobytes on Linux
+    result['peak_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark suite for the simulators")
+    parser.add_argument('--quick', action='store_true', help="only the small cases")
+    parser.add_argument('--seed', type=int, default=12345)
+    parser.add_argument('-o', '--output', default=None, help="append JSON lines to this file instead of stdout")
+    parser.add_argument('--case', default=None, help=argparse.SUPPRESS) #Used internally to run one case in a child process
+    args = parser.parse_args(argv)
+
+    if args.case is not None:
+        case = json.loads(args.case)
+        print(json.dumps(run_case(case['suite'], case['params'], case['seed'])))
+        return
+
+    cases = ([('manufacturing', p) for p in (QUICK_MANUFACTURING if args.quick else MANUFACTURING_CASES)]
+             + [('elections', p) for p in (QUICK_ELECTIONS if args.quick else ELECTIONS_CASES)])
+    out = open(args.output, 'a') if args.output else sys.stdout
+    try:
+        for suite, params in cases:
+            case = json.dumps({'suite': suite, 'params': params, 'seed': args.seed})
+            child = subprocess.run([sys.executable, os.path.abspath(__file__), '--case', case],
+                                   cwd=ROOT, check=True, capture_output=True, text=True)
+            record = {'suite': suite, 'params': params, 'seed': args.seed, 'timestamp': time.time(),
+                      'python': platform.python_version(), 'machine': platform.machine()}
+            record.update(json.loads(child.stdout))
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,52 @@
-import random
+import argparse
 import heapq
 
-priorityQ = []
-rolls = [random.randint(1, 6) for i in range(10)]
+def roll_dice(count, rng=None):
+    #rng is a RandomStream or a seed (see rng.py), NumPy is only imported when we actually roll
+    from rng import as_stream
+    rng = as_stream(rng)
+    return [rng.randint(1, 6) for i in range(count)]
 
-for i in rolls:
-    heapq.heappush(priorityQ, i)
+def remove_lowest(rolls, count):
+    priorityQ = []
+    for i in rolls:
+        heapq.heappush(priorityQ, i)
 
-removedQ = [heapq.heappop(priorityQ) for i in range(5)] #I removed the min ones, I looked it up to double check,
-                                                        #heapq.heappop is min-heap, it removes low value elements
+    removedQ = [heapq.heappop(priorityQ) for i in range(min(count, len(rolls)))] #I removed the min ones, I looked it up to double check,
+                                                                #heapq.heappop is min-heap, it removes low value elements
+    return priorityQ, removedQ
 
-print("İnitial Rolls:", rolls)
-print("Final Priority Queue:", priorityQ)
-print("Removed items:", removedQ)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Roll dice and remove the lowest ones with a priority queue")
+    parser.add_argument('--rolls', type=int, default=10)
+    parser.add_argument('--remove', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--counts', action='store_true', help="only print how many of each face were rolled and removed, "
+                                                               "for very large numbers of rolls")
+    args = parser.parse_args(argv)
+    if args.rolls < 0 or args.remove < 0:
+        parser.error("--rolls and --remove can not be negative")
+    if args.remove > args.rolls:
+        parser.error(f"can not remove {args.remove} dice from {args.rolls} rolls")
+
+    if args.counts:
+        #Rolls are made in NumPy batches and only counted, see dice_engine.py
+        import dice_engine
+        stream = dice_engine.DiceStream()
+        for batch in dice_engine.roll_batches(args.rolls, rng=args.seed):
+            stream.update(batch)
+        removed = stream.lowest_counts(args.remove)
+        print("Rolled (faces 1-6):", stream.counts.tolist())
+        print("Removed (faces 1-6):", removed.tolist())
+        print("Remaining (faces 1-6):", (stream.counts - removed).tolist())
+        return
+
+    rolls = roll_dice(args.rolls, args.seed)
+    priorityQ, removedQ = remove_lowest(rolls, args.remove)
+
+    print("İnitial Rolls:", rolls)
+    print("Final Priority Queue:", priorityQ)
+    print("Removed items:", removedQ)
+
+if __name__ == "__main__":
+    main()
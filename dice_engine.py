@@ -0,0 +1,72 @@
+#Dice rolling at high volume: rolls are generated in NumPy batches of small integers instead of one randint call per die
+#Since a die only has 6 values, most questions (how many of each, which k are the lowest) can be answered from counts
+import numpy as np
+
+from rng import as_generator
+
+FACES = np.arange(1, 7, dtype=np.uint8)
+
+def roll_batches(total, batch_size=1 << 20, rng=None):
+    #Yielding total rolls as uint8 arrays of at most batch_size, so memory does not depend on total
+    rng = as_generator(rng) #rng can be a RandomStream, a Generator or a seed
+    while total > 0:
+        n = min(batch_size, total)
+        yield rng.integers(1, 7, size=n, dtype=np.uint8)
+        total -= n
+
+def roll(count, rng=None):
+    rng = as_generator(rng)
+    return rng.integers(1, 7, size=count, dtype=np.uint8)
+
+def count_faces(rolls):
+    #How many times each face 1..6 shows up
+    return np.bincount(rolls, minlength=7)[1:]
+
+def roll_counts(total, rng=None):
+    #Counts of each face for total rolls without generating the rolls at all, the counts of fair dice are multinomial
+    rng = as_generator(rng)
+    return rng.multinomial(total, np.full(6, 1 / 6))
+
+def remove_lowest(rolls, k):
+    #Exact split into the k lowest rolls (sorted) and the rest, with one partition instead of k heap pops
+    k = min(k, len(rolls))
+    parts = np.partition(rolls, k - 1) if k else rolls
+    return np.sort(parts[:k]), parts[k:]
+
+def remove_highest(rolls, k):
+    #Same as remove_lowest for the k highest rolls, sorted from high to low
+    k = min(k, len(rolls))
+    parts = np.partition(rolls, len(rolls) - k) if k else rolls
+    return np.sort(parts[len(parts) - k:])[::-1], parts[:len(parts) - k]
+
+def take_first(counts, k):
+    #Taking k items from groups of the given sizes in order: all of the first group, then the next, until k is reached
+    before = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    return np.minimum(counts, np.maximum(k - before, 0))
+
+class DiceStream:
+    #Bottom-k and top-k over a stream of rolls that never ends, keeping only 6 counters
+    def __init__(self):
+        self.counts = np.zeros(6, dtype=np.int64)
+
+    def update(self, rolls):
+        self.counts += count_faces(rolls)
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def lowest_counts(self, k):
+        #How many of each face are among the k lowest rolls seen so far
+        return take_first(self.counts, k)
+
+    def highest_counts(self, k):
+        #Same from the top: we take from face 6 down
+        return take_first(self.counts[::-1], k)[::-1]
+
+    def lowest(self, k):
+        #The k lowest rolls themselves, sorted, k should be small enough to hold in memory
+        return np.repeat(FACES, self.lowest_counts(k))
+
+    def highest(self, k):
+        return np.repeat(FACES, self.highest_counts(k))[::-1]
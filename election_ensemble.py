@@ -0,0 +1,47 @@
+#Ensembles of the elections model: many seeds of ElectionSimulation spread over a process pool
+#Each run gets its own child stream of one base seed, so the whole ensemble can be reproduced
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from election_sim import ElectionSimulation
+from population import OFFICES
+from rng import RandomStream
+
+def run_member(params):
+    #One simulation, only the end PSI and the average fill rate per office are sent back
+    seed, years, consul_rule = params
+    sim = ElectionSimulation(seed=seed, consul_rule=consul_rule).run(years)
+    rates = sim.average_fill_rates()
+    return sim.PSI, [rates[office] for office in OFFICES]
+
+def run_ensemble(runs, years=200, consul_rule=True, base_seed=0, workers=None):
+    seeds = RandomStream(base_seed).spawn(runs)
+    params = [(seed, years, consul_rule) for seed in seeds]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = [run_member(p) for p in params]
+    else:
+        #Big chunks, since a single run is short and pickling the arguments should not dominate
+        chunksize = max(1, runs // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_member, params, chunksize=chunksize))
+    psi = np.array([r[0] for r in results])
+    fill_rates = np.array([r[1] for r in results]) #One row per run, one column per office in OFFICES order
+    return {
+        'psi': psi,
+        'fill_rates': fill_rates,
+        'psi_mean': psi.mean(),
+        'psi_std': psi.std(ddof=1) if runs > 1 else 0.0,
+        'psi_percentiles': dict(zip((5, 25, 50, 75, 95), np.percentile(psi, (5, 25, 50, 75, 95)))),
+        'fill_rate_mean': dict(zip(OFFICES, fill_rates.mean(axis=0))),
+    }
+
+if __name__ == "__main__":
+    for rule in (False, True):
+        result = run_ensemble(1000, consul_rule=rule)
+        print(f"Consul rule {'on' if rule else 'off'}: mean PSI = {result['psi_mean']:.2f}, std = {result['psi_std']:.2f}, "
+              f"percentiles = {', '.join(f'{p}%: {v:.0f}' for p, v in result['psi_percentiles'].items())}")
+        for office, rate in result['fill_rate_mean'].items():
+            print(f"  {office}: {rate:.2f}%")
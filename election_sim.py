@@ -0,0 +1,233 @@
+#The elections model as a class, so every simulation keeps its own state and its own seeded random generator
+#elections.py (without the Consul 10 year rule) and elections_final.py (with it) are both this class with a different policy
+import time
+
+import numpy as np
+
+from online_stats import OnlineStats
+from rng import as_stream
+from population import Population, CandidateIndex, ConsulCooldown, OfficeLog, OFFICES, NO_POSITION
+
+#Fixed Parameters
+expectancy_mean = 55
+expectancy_std = 10
+expectancy_min = 25
+expectancy_max = 80
+new_mean = 15
+new_std = 5
+
+#Requirements for age and service
+service_req = {
+    "Quaestor": {"min_age": 30, "min_service": 0},
+    "Aedile": {"min_age": 36, "min_service": 2, "previous_office": "Quaestor"},
+    "Praetor": {"min_age": 39, "min_service": 2, "previous_office": "Aedile"},
+    "Consul": {"min_age": 42, "min_service": 2, "previous_office": "Praetor"},
+}
+
+#Number of places in each office
+office_places = {"Quaestor": 20, "Aedile": 10, "Praetor": 8, "Consul": 2}
+QUAESTOR, AEDILE, PRAETOR, CONSUL = range(len(OFFICES)) #Position codes used in the population arrays
+
+class ElectionSimulation:
+    def __init__(self, seed=None, consul_rule=True, consul_gap=10, office_places=office_places, keep_history=False,
+                 influx_mean=new_mean, influx_std=new_std):
+        #seed can be an int, a SeedSequence or a RandomStream spawned for an ensemble (see rng.py)
+        #Arrays are drawn from the stream's Generator, single numbers from its pre-drawn buffers
+        self.rng = as_stream(seed)
+        self.generator = self.rng.generator
+        self.consul_rule = consul_rule #False is the first version of the model, without the 10 year rule and its -10 penalty
+        self.PSI = 100 #Initial Political Stability Index PSI
+        self.influx_mean = influx_mean #New candidates per year, bigger offices may need more of them
+        self.influx_std = influx_std
+        self.profiler = None #A PhaseProfiler (see profiling.py) makes simulate_year time every phase, see enable_profiling
+        self.year = 0
+        self.office_capacity = np.array([office_places[office] for office in OFFICES])
+        self.office_min_age = np.array([service_req[office]['min_age'] for office in OFFICES])
+        #Our pool of politicians, every attribute is a NumPy array, see population.py
+        self.politician_pool = Population()
+        self.occupied = np.zeros(len(OFFICES), dtype=np.int64) #Live number of filled places per office
+        self.candidate_index = CandidateIndex(self.office_min_age) #Unassigned politicians bucketed by the offices they are old enough for
+        self.consul_cooldown = ConsulCooldown(consul_gap) #Who is still inside the 10 year rule, and when they get out of it
+        self.keep_history = keep_history #True logs every election in office_log, the simulation itself does not need it
+        self.office_log = OfficeLog()
+        #Running statistics over the years, constant memory however long we simulate
+        self.fill_rate_stats = OnlineStats(len(OFFICES), bins=np.arange(0, 101, 5)) #Yearly fill rate per office, in percent
+        self.psi_stats = OnlineStats(1) #PSI at the end of every year
+        self.age_stats = OnlineStats(len(OFFICES)) #Yearly mean age per office, only updated while iterating with iter_years
+        self.initial_politicians() #Initially filling the offices before our simulation starts
+
+    def draw_cohort(self, count):
+        #Ages and life expectancies for a whole cohort, with one vectorized call each instead of two scalar calls per politician
+        #I used this formula to generate random ages, since there were no statements about it
+        ages = self.generator.integers(expectancy_min, expectancy_max + 1, size=count)
+        life = np.maximum(ages + 1, np.minimum(self.generator.normal(expectancy_mean, expectancy_std, size=count), expectancy_max))
+        return ages, life
+
+    def initial_politicians(self):
+        initial_year = 1 #We are starting from 1st year
+        #Everybody is created in one go: positions repeated by their avaiable number, and they start at min required age for that place
+        positions = np.repeat(np.arange(len(OFFICES)), self.office_capacity)
+        ages = self.office_min_age[positions]
+        #Adjusting life expectancy to ensure it's  above the current age
+        life = np.clip(self.generator.normal(expectancy_mean, expectancy_std, size=len(positions)), ages + 1, expectancy_max)
+        self.politician_pool.add(ages, life, initial_year, positions=positions)
+        self.occupied[:] += self.office_capacity
+
+    def annual_influx_of_candidates(self, current_year):
+        new_candidates_count = max(int(np.round(self.rng.normal(self.influx_mean, self.influx_std))), 0) #Ensure non-negative
+        #Ids are given as one range by the pool, names are only built when asked for with politician_pool.name(row)
+        self.politician_pool.add(*self.draw_cohort(new_candidates_count), current_year)
+
+    def age_life(self):
+        #We are checking aging and life expectancy here
+        pool = self.politician_pool
+        alive = pool.age < pool.life_expectancy #Checking if they are still living
+        dead_positions = pool.position[~alive]
+        self.occupied[:] -= np.bincount(dead_positions[dead_positions != NO_POSITION], minlength=len(OFFICES)) #Their places are empty now
+        pool.keep(alive)
+        pool.age[:] += 1 #Incrementing their age and years served if they are in a position
+        pool.years_of_service[pool.position != NO_POSITION] += 1
+
+    def eligible_for_consul(self, current_year):
+        #Usually nobody is inside the 10 year rule, then there is nothing to check and we return None (everyone is eligible)
+        if not self.consul_rule or not self.consul_cooldown.cooling:
+            return None
+        #Otherwise the stored last Consul year answers it, no history lists are walked
+        return current_year - self.politician_pool.consul_year >= self.consul_cooldown.years
+
+    def fill_empty(self, current_year):
+        #We are filling the empty positions here, from highest office first
+        pool = self.politician_pool
+        index = self.candidate_index
+        vacancies = self.office_capacity - self.occupied
+        if self.consul_rule:
+            self.consul_cooldown.advance(current_year)
+        #Candidates are sorted into buckets once, the Consul bucket is split by the 10 year rule
+        index.rebuild(pool, self.eligible_for_consul(current_year))
+        draws = self.generator.random(int(vacancies.sum())) #One uniform number per vacancy, drawn in bulk
+        d = 0
+
+        for office in (CONSUL, PRAETOR, AEDILE, QUAESTOR):
+            last_bucket = None #Every bucket from this office up is old enough
+            if office == CONSUL and self.consul_rule:
+                #First, we try to find eligible candidates who have not served as Consul in the last 10 years
+                last_bucket = CONSUL
+                if index.count(CONSUL, CONSUL) == 0:
+                    #Here, we consider all candidates, not caring about 10 year rule
+                    #Since we're not applying the 10-year rule due to a lack of candidates, we decrease PSI by 10
+                    last_bucket = None
+                    self.PSI -= 10
+
+            elected_rows = []
+            for _ in range(vacancies[office]):
+                elected = index.draw(office, last_bucket, draws[d]) #Selecting them randomly, and taking them out of the index
+                d += 1
+                if elected is None:
+                    self.PSI -= 5 #We have a -5 penalty if a place is not filled
+                    continue
+                pool.position[elected] = office #Assigning their new place
+                self.occupied[office] += 1
+                elected_rows.append(elected)
+                if office == CONSUL:
+                    pool.consul_year[elected] = current_year
+                    if self.consul_rule:
+                        self.consul_cooldown.elected(pool.ids[elected], current_year)
+            if self.keep_history and elected_rows:
+                self.office_log.append(pool.ids[elected_rows], office, current_year)
+
+    def calculate_fill_rates(self):
+        fill_rates = self.occupied / self.office_capacity * 100 #Converting them to a percentage rate
+        self.fill_rate_stats.add(fill_rates)
+        self.psi_stats.add(self.PSI)
+        return fill_rates
+
+    def simulate_year(self, current_year=None):
+        #Simulating one year, by default the one after the last simulated year
+        current_year = self.year + 1 if current_year is None else current_year
+        if self.profiler is not None:
+            return self._simulate_year_profiled(current_year)
+        self.age_life()
+        self.annual_influx_of_candidates(current_year)
+        self.fill_empty(current_year)
+        fill_rates = self.calculate_fill_rates()
+        #Finally, we are setting the politician pool in the end, new candidates that did not get any place are dropped
+        pool = self.politician_pool
+        pool.keep((pool.added < current_year) | (pool.position != NO_POSITION))
+        self.year = current_year
+        return fill_rates
+
+    def enable_profiling(self):
+        from profiling import PhaseProfiler
+        self.profiler = PhaseProfiler()
+        return self.profiler
+
+    def _simulate_year_profiled(self, current_year):
+        #Same steps as simulate_year, each one timed, and the pool size recorded at the end of the year
+        profiler = self.profiler
+        started = time.perf_counter()
+        profiler.timed('age_life', self.age_life)
+        profiler.timed('influx', self.annual_influx_of_candidates, current_year)
+        profiler.timed('fill_empty', self.fill_empty, current_year)
+        fill_rates = profiler.timed('fill_rates', self.calculate_fill_rates)
+        pool = self.politician_pool
+        profiler.timed('prune', lambda: pool.keep((pool.added < current_year) | (pool.position != NO_POSITION)))
+        self.year = current_year
+        profiler.pool_sizes.append(len(pool))
+        profiler.wall_seconds += time.perf_counter() - started
+        return fill_rates
+
+    def run(self, years):
+        for _ in range(years):
+            self.simulate_year()
+        return self
+
+    def iter_years(self, years):
+        #Simulating year by year and yielding a small snapshot after each one, so long runs can be watched live
+        for _ in range(years):
+            fill_rates = self.simulate_year()
+            ages = self.office_age_stats()
+            self.age_stats.add(ages['mean']) #Empty offices have a NaN mean and are skipped
+            empty = ages['count'] == 0
+            yield {
+                'year': self.year,
+                'PSI': self.PSI,
+                'fill_rates': dict(zip(OFFICES, fill_rates.tolist())),
+                'vacancies': dict(zip(OFFICES, (self.office_capacity - self.occupied).tolist())),
+                'ages': {office: {stat: None if empty[code] and stat != 'count' else ages[stat][code].item() for stat in ages}
+                         for code, office in enumerate(OFFICES)},
+            }
+
+    def office_age_stats(self):
+        #Count, mean, std, min and max age of the officeholders of each office, without building per-office lists
+        pool = self.politician_pool
+        held = pool.position != NO_POSITION
+        codes = pool.position[held]
+        ages = pool.age[held].astype(float)
+        n = len(OFFICES)
+        count = np.bincount(codes, minlength=n)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.bincount(codes, ages, n) / count
+            std = np.sqrt(np.maximum(np.bincount(codes, ages * ages, n) / count - mean * mean, 0))
+        low = np.full(n, np.inf)
+        high = np.full(n, -np.inf)
+        np.minimum.at(low, codes, ages)
+        np.maximum.at(high, codes, ages)
+        return {'count': count, 'mean': mean, 'std': std, 'min': low, 'max': high}
+
+    def average_fill_rates(self):
+        return dict(zip(OFFICES, self.fill_rate_stats.mean.tolist()))
+
+    def report(self):
+        #Printing out all the requested information in project here, the age distribution is the one of the last year
+        print(f"End-of-Simulation PSI: {self.PSI}")
+        print("Annual Fill Rate:")
+        for office, rate in self.average_fill_rates().items():
+            print(f"  {office}: {rate:.2f}%")
+        print("Age Distribution:")
+        ages = self.office_age_stats()
+        for code, office in enumerate(OFFICES):
+            if ages['count'][code]:
+                print(f"  {office}: Mean Age = {ages['mean'][code]:.2f}, Std Dev = {ages['std'][code]:.2f}, "
+                      f"Min = {ages['min'][code]:.0f}, Max = {ages['max'][code]:.0f}")
+            else:
+                print(f"  {office}: No politicians")
@@ -0,0 +1,135 @@
+#Online KPIs for manufacturing.Simulation
+#Everything here is updated on state changes only, with O(1) memory per metric, and can be read in the middle of a run
+import math
+
+class QuantileSketch:
+    #Streaming quantiles from a histogram with logarithmic buckets, every value lands in a bucket within relative_accuracy of it
+    #The number of buckets only depends on the range of the values, not on how many values we add
+    def __init__(self, relative_accuracy=0.01):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zeros = 0 #Values <= 0 can not go in a log bucket, cycle times are positive anyway
+        self.count = 0
+
+    def add(self, x):
+        self.count += 1
+        if x > 0:
+            key = math.ceil(math.log(x) / self.log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + 1
+        else:
+            self.zeros += 1
+
+    def quantile(self, p):
+        if self.count == 0:
+            return float('nan')
+        rank = p * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                return 2 * self.gamma ** key / (self.gamma + 1) #Middle of the bucket
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+class RunningStats:
+    #Count, mean, variance (Welford), min and max of a stream of values
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+class KpiTracker:
+    #Busy and down times are kept as plain lists indexed by machine/operator id
+    #Busy time is added by the simulation when a stage ends (a stage takes exactly the machine's process_time),
+    #so nothing has to happen when work starts; work still in progress is passed to report
+    #A machine released by maintenance can be handed out while its old stage still runs, so for machines we add
+    #only the part of the stage after machine_busy_until, which keeps overlapping stages from being counted twice
+    def __init__(self, num_machines, num_operators, quantiles=(0.5, 0.9, 0.99), start=0):
+        self.start = start
+        self.machine_busy_time = [0.0] * num_machines
+        self.machine_busy_until = [start] * num_machines
+        self.machine_down_since = [None] * num_machines
+        self.machine_down_time = [0.0] * num_machines
+        self.operator_busy_time = [0.0] * num_operators
+        #Time-weighted queue length: area under the length curve, plus the last change
+        self.queue_area = 0.0
+        self.queue_length = 0
+        self.queue_since = start
+        self.queue_max = 0
+        self.cycle_time = RunningStats()
+        self.quantiles = quantiles
+        self.cycle_sketch = QuantileSketch()
+
+    def machine_down(self, now, machine_id):
+        if self.machine_down_since[machine_id] is None:
+            self.machine_down_since[machine_id] = now
+
+    def machine_up(self, now, machine_id):
+        since = self.machine_down_since[machine_id]
+        if since is not None:
+            self.machine_down_time[machine_id] += now - since
+            self.machine_down_since[machine_id] = None
+
+    def queue_changed(self, now, length):
+        self.queue_area += self.queue_length * (now - self.queue_since)
+        self.queue_length = length
+        self.queue_since = now
+        if length > self.queue_max:
+            self.queue_max = length
+
+    def product_finished(self, cycle_time):
+        self.cycle_time.add(cycle_time)
+        self.cycle_sketch.add(cycle_time)
+
+    def report(self, now, in_progress=()):
+        #Current values of every KPI, the intervals that are still open are counted up to now
+        #in_progress is (machine_id, operator_id, stage start time) for every stage that has not ended yet
+        elapsed = now - self.start
+        operator_busy = list(self.operator_busy_time)
+        first_start = {}
+        for machine_id, operator_id, started in in_progress:
+            operator_busy[operator_id] += now - started
+            if started < first_start.get(machine_id, now):
+                first_start[machine_id] = started
+        machine_busy = list(self.machine_busy_time)
+        for machine_id, started in first_start.items():
+            machine_busy[machine_id] += now - max(started, self.machine_busy_until[machine_id])
+        def ratio(total, since=None):
+            open_part = now - since if since is not None else 0.0
+            return (total + open_part) / elapsed if elapsed > 0 else 0.0
+        stats = self.cycle_time
+        return {
+            'time': now,
+            'machine_utilization': [ratio(t) for t in machine_busy],
+            'machine_downtime': [ratio(t, s) for t, s in zip(self.machine_down_time, self.machine_down_since)],
+            'operator_utilization': [ratio(t) for t in operator_busy],
+            'queue_length_mean': ((self.queue_area + self.queue_length * (now - self.queue_since)) / elapsed
+                                  if elapsed > 0 else float(self.queue_length)),
+            'queue_length_max': self.queue_max,
+            'queue_length': self.queue_length,
+            'cycle_time': {
+                'count': stats.count,
+                'mean': stats.mean if stats.count else float('nan'),
+                'std': math.sqrt(stats.variance()),
+                'min': stats.min if stats.count else float('nan'),
+                'max': stats.max if stats.count else float('nan'),
+                'quantiles': {p: self.cycle_sketch.quantile(p) for p in self.quantiles},
+            },
+        }
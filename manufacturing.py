@@ -1,154 +1,385 @@
+import argparse
 import heapq
+import time as timer
+import os
+import pickle
 import random
-import pandas as pd
+import zlib
 from collections import deque
+from kpi import KpiTracker
+import tracing
+from tracing import TRACE_OFF, TRACE_SUMMARY, TRACE_EVENTS, Tracer
 
-class Event: #Required attributes defined here
-    def __init__(self, time, event_type, product, machine=None, operator=None):
-        self.time = time
-        self.event_type = event_type
-        self.product = product
-        self.machine = machine
-        self.operator = operator
-    
-    def __lt__(self, other):
-        return self.time < other.time
+#Event kinds are small integers, so process_event can look the handler up in a table instead of comparing strings
+START_PROCESS = 0
+END_PROCESS = 1
+MACHINE_FAILURE = 2
+MAINTENANCE = 3
+ARRIVAL = 4
+EVENT_NAMES = ('start_process', 'end_process', 'machine_failure', 'maintenance', 'arrival')
+
+#Events are plain tuples: (time, seq, kind, product, machine, operator)
+#seq is a running counter, so two events at the same time are ordered by scheduling order and the heap never compares the objects
 
 class Machine: #Machines have ID's process times and random failures assigned, also their status as busy or not
-    def __init__(self, id, process_time, failure_rate):
+    def __init__(self, id, process_time, failure_rate, rng=random):
         self.id = id
         self.process_time = process_time
         self.failure_rate = failure_rate
         self.is_busy = False
-        self.maintenance_time = random.uniform(10, 30) #I assigned a random maintenance here for 10-30 mins
+        self.in_pool = False #True while the machine has an entry in the simulation's idle pool
+        self.maintenance_time = rng.uniform(10, 30) #I assigned a random maintenance here for 10-30 mins
 
 class Operator: #Workers assigned, busy or not
     def __init__(self, id):
         self.id = id
         self.is_busy = False
+        self.in_pool = False
 
 class Product: #Products initially raw materials
     def __init__(self, id):
         self.id = id
         self.state = 'raw_material'
         self.current_stage = 0
+        self.release_time = None #When the order was released to the factory, waiting time counts from here
+        self.start_time = None #When the first stage started
+        self.stage_times = [] #When each stage ended
+
+def resource_id(resource): #Default pool priority, a plain function so pools can be pickled in a checkpoint
+    return resource.id
+
+#Idle pools are heaps of (priority, id, resource), so picking a free machine or operator does not scan every resource
+#Entries are removed lazily: a resource that became busy while it was in the pool is skipped when it reaches the top
+class ResourcePool:
+    def __init__(self, resources, priority=None):
+        self.priority = priority if priority is not None else resource_id #Lowest id first, same as scanning the list
+        self.heap = []
+        for r in resources:
+            self.release(r)
+
+    def release(self, resource):
+        resource.is_busy = False
+        if not resource.in_pool:
+            resource.in_pool = True
+            heapq.heappush(self.heap, (self.priority(resource), resource.id, resource))
+
+    def peek(self):
+        #Returning the best idle resource without taking it, or None if nothing is idle
+        heap = self.heap
+        while heap and heap[0][2].is_busy:
+            heapq.heappop(heap)[2].in_pool = False
+        return heap[0][2] if heap else None
+
+    def acquire(self):
+        resource = self.peek()
+        if resource is not None:
+            heapq.heappop(self.heap)
+            resource.in_pool = False
+            resource.is_busy = True
+        return resource
 
 class Simulation:
-    def __init__(self, num_machines, num_operators, shift_length, end_time):
+    def __init__(self, num_machines, num_operators, shift_length, end_time, machine_priority=None, operator_priority=None, tracer=None, seed=None, recorder=None, keep_products=True, track_kpis=False):
         #Initializing the simulation here
         self.clock = 0
         self.event_queue = []
+        #Every simulation has its own random stream, so runs with the same seed are the same and runs in parallel do not share state
+        #seed can also be a RandomStream, e.g. one spawned from a parent stream (see rng.py)
+        from rng import as_stream #Imported here so a bare import of this module does not load NumPy
+        self.rng = as_stream(seed)
         #I used random times to complete a task, assuming that we are working on different model of car, skill of operator etc.
-        self.machines = [Machine(i, random.uniform(5, 15), random.uniform(0.01, 0.05)) for i in range(num_machines)]
+        self.machines = [Machine(i, self.rng.uniform(5, 15), self.rng.uniform(0.01, 0.05), self.rng) for i in range(num_machines)]
         self.operators = [Operator(i) for i in range(num_operators)]
+        #machine_priority can be e.g. operator.attrgetter('process_time') to always pick the fastest idle machine
+        #(a lambda works too, but then the simulation can not be checkpointed)
+        self.idle_machines = ResourcePool(self.machines, machine_priority)
+        self.idle_operators = ResourcePool(self.operators, operator_priority)
+        #Utilization, downtime, queue length and cycle time are updated online, see kpi_report
+        #They are off by default, since they add a few percent to every event
+        self.kpi = KpiTracker(num_machines, num_operators) if track_kpis else None
         self.shift_length = shift_length
         self.product_queue = deque()
         self.processed_products = []
+        self.keep_products = keep_products #For very long runs, False stops keeping every finished Product object
+        self.arrivals = None #Iterator of (time, Product) from an arrival source, see add_arrivals
         self.end_time = end_time
-        self.data = []
+        #Finished products are recorded in columns, pass ResultsRecorder(path=...) to stream them to a file
+        if recorder is None:
+            from recorder import ResultsRecorder #Imported here so a bare import of this module does not load NumPy
+            recorder = ResultsRecorder()
+        self.recorder = recorder
         self.waiting_products = deque()
+        #Tracing is off unless a Tracer is given, the handlers only compare trace_level when it is off
+        self.tracer = tracer
+        self.trace_level = tracer.level if tracer is not None else TRACE_OFF
+        self.event_seq = 0 #Tie-break counter for events at the same time
+        #Dispatch table indexed by event kind, every handler takes (product, machine, operator)
+        self.profiler = None #An EventProfiler (see profiling.py) makes run() time every event, see enable_profiling
+        self.handlers = [self._on_start_process, self.end_process, self._on_machine_failure, self._on_maintenance, self._on_arrival]
 
-    def schedule_event(self, event):
+    def schedule_event(self, time, kind, product=None, machine=None, operator=None):
         #We are making a new event and adding it to the event queue
-        heapq.heappush(self.event_queue, event)
-
-    def run(self):
-        #We are checking if we pass the total runtime, since we have a schedule 
-        while self.clock < self.end_time:
-            if self.event_queue:
-                event = heapq.heappop(self.event_queue)
-                self.clock = event.time
-                self.process_event(event)
-            else:
-                break
+        self.event_seq += 1
+        heapq.heappush(self.event_queue, (time, self.event_seq, kind, product, machine, operator))
+
+    def run(self, until=float('inf')):
+        #We are checking if we pass the total runtime, since we have a schedule
+        #until pauses the run before the first event at or after that time, calling run again continues exactly from there
+        #Locals are used here since this loop runs for every single event
+        if self.profiler is not None:
+            return self._run_profiled(until)
+        queue = self.event_queue
+        handlers = self.handlers
+        pop = heapq.heappop
+        end_time = self.end_time
+        while queue and self.clock < end_time and queue[0][0] < until:
+            time, _, kind, product, machine, operator = pop(queue)
+            self.clock = time
+            handlers[kind](product, machine, operator)
+
+    def enable_profiling(self):
+        from profiling import EventProfiler
+        self.profiler = EventProfiler(EVENT_NAMES)
+        return self.profiler
+
+    def _run_profiled(self, until):
+        #Same loop as run, with a timer around every handler and the queue size tracked
+        profiler = self.profiler
+        counts = profiler.counts
+        seconds = profiler.seconds
+        queue = self.event_queue
+        handlers = self.handlers
+        pop = heapq.heappop
+        end_time = self.end_time
+        now = timer.perf_counter
+        started = now()
+        while queue and self.clock < end_time and queue[0][0] < until:
+            if len(queue) > profiler.heap_high_water:
+                profiler.heap_high_water = len(queue)
+            time, _, kind, product, machine, operator = pop(queue)
+            self.clock = time
+            t = now()
+            handlers[kind](product, machine, operator)
+            seconds[kind] += now() - t
+            counts[kind] += 1
+        profiler.wall_seconds += now() - started
+
+    def run_with_checkpoints(self, path, interval):
+        #Running to the end, saving a checkpoint every interval minutes of simulated time
+        next_checkpoint = self.clock + interval
+        while self.event_queue and self.clock < self.end_time:
+            self.run(until=next_checkpoint)
+            self.save_checkpoint(path)
+            if self.event_queue: #Intervals without any event would only write the same snapshot again, so we skip them
+                next_checkpoint += ((self.event_queue[0][0] - next_checkpoint) // interval + 1) * interval
+
+    def save_checkpoint(self, path, compress=True):
+        #Saving the whole state (clock, events, resources, waiting products, results, random streams) to one binary file
+        #Pending trace and result rows are flushed first, so the files on disk match the snapshot
+        if self.tracer is not None:
+            self.tracer.flush()
+        self.recorder.flush()
+        blob = pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+        if compress:
+            blob = zlib.compress(blob, 1) #Fast level, most of the gain comes from the repeated references anyway
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(b'Z' if compress else b'P')
+            f.write(blob)
+        os.replace(tmp, path) #A crash while writing never leaves a broken checkpoint behind
+
+    @staticmethod
+    def load_checkpoint(path, recorder_path=None, trace_path=None):
+        #Restoring a simulation saved with save_checkpoint, run() then continues exactly like the original run would
+        #By default the result and trace files are cut back to the checkpoint and written on from there
+        #recorder_path and trace_path give the restored run its own files instead, starting as a copy of the output
+        #up to the checkpoint, so several runs can be forked from one checkpoint without writing over each other
+        with open(path, 'rb') as f:
+            kind = f.read(1)
+            blob = f.read()
+        if kind == b'Z':
+            blob = zlib.decompress(blob)
+        sim = pickle.loads(blob)
+        sim.recorder.restore_output(recorder_path)
+        if sim.tracer is not None:
+            sim.tracer.restore_output(trace_path)
+        return sim
 
     def process_event(self, event):
         #Events are here, start-end, and machine failures handled here
-        if event.event_type == 'start_process':
-            self.start_process(event.product)
-        elif event.event_type == 'end_process':
-            self.end_process(event.product, event.machine, event.operator)
-        elif event.event_type == 'machine_failure':
-            self.handle_machine_failure(event.machine)
-        elif event.event_type == 'maintenance':
-            self.perform_maintenance(event.machine)
+        self.handlers[event[2]](event[3], event[4], event[5])
+
+    #Small adapters so that every entry of the dispatch table has the same signature
+    def _on_start_process(self, product, machine, operator):
+        self.start_process(product)
+
+    def _on_machine_failure(self, product, machine, operator):
+        self.handle_machine_failure(machine)
+
+    def _on_maintenance(self, product, machine, operator):
+        self.perform_maintenance(machine)
+
+    def _on_arrival(self, product, machine, operator):
+        #A new order arrived, we try to start it and only then ask the source for the next one
+        product.release_time = self.clock
+        self.start_process(product)
+        self.schedule_next_arrival()
 
     def start_process(self, product):
         #We can start processing a product if a machine and operator are available
-        available_machine = next((m for m in self.machines if not m.is_busy), None)
-        available_operator = next((o for o in self.operators if not o.is_busy), None)
-        if available_machine and available_operator: #If we have both avaiable operator and machine we can start
-            print(f"Starting process for Product {product.id} at time {self.clock} on Machine {available_machine.id} with Operator {available_operator.id}")
-            available_machine.is_busy = True #Setting the used machine and operator taking the job as busy
-            available_operator.is_busy = True
+        if self.idle_machines.peek() and self.idle_operators.peek(): #If we have both avaiable operator and machine we can start
+            available_machine = self.idle_machines.acquire() #Taking them out of the idle pools marks them as busy
+            available_operator = self.idle_operators.acquire()
+            if self.trace_level >= TRACE_EVENTS:
+                self.tracer.record(self.clock, tracing.START, product.id, available_machine.id, available_operator.id)
             product.state = 'processing'
-            self.schedule_event(Event(self.clock + available_machine.process_time, 'end_process', product, available_machine, available_operator))
+            if product.start_time is None:
+                product.start_time = self.clock
+            self.schedule_event(self.clock + available_machine.process_time, END_PROCESS, product, available_machine, available_operator)
         else: #If requirements not met, we wait
-            print(f"No available machine or operator for Product {product.id} at time {self.clock}")
+            if self.trace_level >= TRACE_EVENTS:
+                self.tracer.record(self.clock, tracing.WAIT, product.id)
             self.waiting_products.append(product)
+            if self.kpi is not None:
+                self.kpi.queue_changed(self.clock, len(self.waiting_products))
 
     def end_process(self, product, machine, operator):
         #Here we end processing a product and check for next stage or completion
-        print(f"Ending process for Product {product.id} at time {self.clock} on Machine {machine.id} with Operator {operator.id}")
-        machine.is_busy = False
-        operator.is_busy = False
+        if self.trace_level >= TRACE_EVENTS:
+            self.tracer.record(self.clock, tracing.END, product.id, machine.id, operator.id)
+        self.idle_machines.release(machine)
+        self.idle_operators.release(operator)
+        kpi = self.kpi
+        if kpi is not None: #The stage took exactly process_time, so busy time is added now and nothing is needed at the start
+            started = self.clock - machine.process_time
+            busy_until = kpi.machine_busy_until[machine.id]
+            kpi.machine_busy_time[machine.id] += self.clock - (started if started > busy_until else busy_until)
+            kpi.machine_busy_until[machine.id] = self.clock
+            kpi.operator_busy_time[operator.id] += machine.process_time
         product.current_stage += 1
+        product.stage_times.append(self.clock)
         if product.current_stage < 4: #Assuming we have 4 stages: machining, assembly, QC, packaging
             self.start_process(product) #Instead of writing each stage 1by1, I just did 4 seperate stages, when I tried otherwise, I printed several lines.
         else:
             product.state = 'finished'
-            self.processed_products.append(product)
-            self.data.append({'ProductID': product.id, 'CompletionTime': self.clock})
+            if self.keep_products:
+                self.processed_products.append(product)
+            if self.trace_level >= TRACE_SUMMARY:
+                self.tracer.record(self.clock, tracing.FINISHED, product.id, machine.id, operator.id)
+            if product.release_time is None: #Products started by hand, without add_product or an arrival source
+                product.release_time = product.start_time
+            self.recorder.record(product.id, product.release_time, product.start_time, self.clock, machine.id, operator.id,
+                                 product.stage_times)
+            if self.kpi is not None:
+                self.kpi.product_finished(self.clock - product.release_time) #Cycle time includes the time spent waiting
         
         #Checking if there are any waiting products
-        if self.waiting_products:
-            next_product = self.waiting_products.popleft()
-            self.start_process(next_product)
+        self.drain_waiting()
         #Making random events here such as machine failures by rolling a dice basically
-        if random.random() < machine.failure_rate:
-            print(f"Machine {machine.id} failed at time {self.clock}")
-            self.schedule_event(Event(self.clock, 'machine_failure', None, machine))
+        if self.rng.random() < machine.failure_rate:
+            if self.trace_level >= TRACE_SUMMARY:
+                self.tracer.record(self.clock, tracing.FAILED, None, machine.id)
+            self.schedule_event(self.clock, MACHINE_FAILURE, None, machine)
 
     def handle_machine_failure(self, machine):
         #Handling a machine failure event by scheduling maintenance
-        print(f"Handling failure for Machine {machine.id} at time {self.clock}")
+        if self.trace_level >= TRACE_SUMMARY:
+            self.tracer.record(self.clock, tracing.FAILURE_HANDLED, None, machine.id)
         machine.is_busy = True #Machine is stated as under maintenance
-        self.schedule_event(Event(self.clock + machine.maintenance_time, 'maintenance', None, machine))
+        if self.kpi is not None:
+            self.kpi.machine_down(self.clock, machine.id)
+        self.schedule_event(self.clock + machine.maintenance_time, MAINTENANCE, None, machine)
 
     def perform_maintenance(self, machine):
         #Performing maintenance on a machine and checking for waiting products
-        print(f"Performing maintenance on Machine {machine.id} at time {self.clock}")
-        machine.is_busy = False
+        if self.trace_level >= TRACE_SUMMARY:
+            self.tracer.record(self.clock, tracing.MAINTENANCE, None, machine.id)
+        self.idle_machines.release(machine)
+        if self.kpi is not None:
+            self.kpi.machine_up(self.clock, machine.id)
+        self.drain_waiting()
+
+    def drain_waiting(self):
+        #Starting as many waiting products as the idle pools allow, in one pass
+        waiting = self.waiting_products
+        if not waiting:
+            return
+        before = len(waiting)
+        while waiting and self.idle_machines.peek() and self.idle_operators.peek():
+            self.start_process(waiting.popleft())
+        if self.kpi is not None and len(waiting) != before:
+            self.kpi.queue_changed(self.clock, len(waiting))
 
-        if self.waiting_products:
-            next_product = self.waiting_products.popleft()
-            self.start_process(next_product)
+    def kpi_report(self):
+        #KPIs up to the current clock, this can be called in the middle of a run too
+        if self.kpi is None:
+            return None
+        #Stages still running are found from their end events, they started process_time before they end
+        in_progress = [(machine.id, operator.id, time - machine.process_time)
+                       for time, _, kind, product, machine, operator in self.event_queue if kind == END_PROCESS]
+        return self.kpi.report(self.clock, in_progress)
 
     def collect_data(self):
-        #Collecting the information here
-        return self.data
+        #Collecting the information here, as column name -> array views of the recorded rows, nothing is copied
+        return self.recorder.view()
 
     def add_product(self, product):
         #Adding a product to the simulation and scheduling it
         self.product_queue.append(product)
-        self.schedule_event(Event(self.clock, 'start_process', product))
+        product.release_time = self.clock
+        self.schedule_event(self.clock, START_PROCESS, product)
+
+    def add_arrivals(self, source):
+        #Products will be created lazily by the source (see arrivals.py) as simulated time advances
+        if getattr(source, 'rng', False) is None:
+            source.rng = self.rng #Sources without their own stream use the simulation's, so the seed covers them too
+        self.arrivals = iter(source)
+        self.schedule_next_arrival()
+
+    def schedule_next_arrival(self):
+        arrival = next(self.arrivals, None)
+        if arrival is not None:
+            time, product = arrival
+            self.schedule_event(time, ARRIVAL, product)
+
+    def to_dataframe(self):
+        #The recorded rows as a pandas DataFrame, pandas is only imported here since it is slow to import
+        import pandas as pd
+        return pd.DataFrame(self.collect_data())
+
+TRACE_LEVELS = {'off': TRACE_OFF, 'summary': TRACE_SUMMARY, 'events': TRACE_EVENTS}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Discrete event simulation of a small factory")
+    parser.add_argument('--machines', type=int, default=3)
+    parser.add_argument('--operators', type=int, default=10)
+    parser.add_argument('--shift-length', type=float, default=8 * 60, help="minutes, 8 hours per shift")
+    #24 hours simulation, we end after 1440 minutes, no extra task taken after that minute
+    parser.add_argument('--end-time', type=float, default=24 * 60, help="minutes to simulate")
+    #Products to be included in a day. I assumed like we got "x" orders and try to complete that order
+    parser.add_argument('--products', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--trace', choices=TRACE_LEVELS, default='events', help="which events are printed while running")
+    parser.add_argument('--output', default=None, help="write the results to this CSV file instead of printing them")
+    args = parser.parse_args(argv)
 
-#Parameters
-num_machines = 3
-num_operators = 10
-shift_length = 8 * 60 #8 hours per shift
-end_time = 24 * 60 #24 hours simulation, we end after 1440 minutes, no extra task taken after that minute
+    #Initializing Simulation
+    from recorder import ResultsRecorder
+    tracer = Tracer(TRACE_LEVELS[args.trace], echo=True) if args.trace != 'off' else None
+    sim = Simulation(args.machines, args.operators, args.shift_length, args.end_time, tracer=tracer, seed=args.seed,
+                     recorder=ResultsRecorder(path=args.output) if args.output else None)
 
-#Initializing Simulation
-sim = Simulation(num_machines, num_operators, shift_length, end_time)
+    #Adding Products
+    for i in range(args.products):
+        sim.add_product(Product(i))
 
-#Adding Products
-for i in range(10): #Products to be included in a day, 1440 minutes. I assumed like we got "x" orders and try to complete that order
-    sim.add_product(Product(i))
+    sim.run()
 
-sim.run()
+    #Results
+    if args.output:
+        sim.recorder.flush()
+    else:
+        print(sim.to_dataframe())
 
-#Results
-data = sim.collect_data()
-df = pd.DataFrame(data)
-print(df)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#Constant-memory running statistics for the elections model
+#A vector of metrics (e.g. one value per office) is updated together, and nothing about single years is kept
+import numpy as np
+
+class OnlineStats:
+    #Count, mean and variance (Welford), min, max and a histogram of every metric in the vector
+    #A NaN value means the metric has no value this time (e.g. the mean age of an empty office) and is skipped,
+    #so every metric keeps its own count
+    def __init__(self, size=1, bins=None):
+        self.count = np.zeros(size, dtype=np.int64)
+        self.mean = np.zeros(size)
+        self.m2 = np.zeros(size)
+        self.min = np.full(size, np.inf)
+        self.max = np.full(size, -np.inf)
+        #Histogram with fixed bin edges, column 0 counts values below the first edge and the last column values at or above the last one
+        self.bins = None if bins is None else np.asarray(bins, dtype=float)
+        self.hist = None if bins is None else np.zeros((size, len(self.bins) + 1), dtype=np.int64)
+
+    def add(self, values):
+        values = np.broadcast_to(np.asarray(values, dtype=float), self.mean.shape)
+        seen = ~np.isnan(values)
+        if not seen.all():
+            self._add_where(values, seen)
+            return
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (values - self.mean)
+        np.minimum(self.min, values, out=self.min)
+        np.maximum(self.max, values, out=self.max)
+        if self.bins is not None:
+            self.hist[np.arange(len(self.mean)), np.searchsorted(self.bins, values, side='right')] += 1
+
+    def _add_where(self, values, seen):
+        #Same update as add, only for the metrics that have a value
+        values = values[seen]
+        self.count[seen] += 1
+        delta = values - self.mean[seen]
+        self.mean[seen] += delta / self.count[seen]
+        self.m2[seen] += delta * (values - self.mean[seen])
+        self.min[seen] = np.minimum(self.min[seen], values)
+        self.max[seen] = np.maximum(self.max[seen], values)
+        if self.bins is not None:
+            self.hist[np.flatnonzero(seen), np.searchsorted(self.bins, values, side='right')] += 1
+
+    def variance(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 1, self.m2 / (self.count - 1), 0.0)
+
+    def std(self):
+        return np.sqrt(self.variance())
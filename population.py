@@ -0,0 +1,191 @@
+#Structure-of-arrays population for the elections models
+#Instead of one Politician object per senator, every attribute is one NumPy array and politician i is index i in all of them,
+#so the yearly steps (deaths, aging, eligibility, counting, pruning) are whole-array operations
+import numpy as np
+
+OFFICES = ("Quaestor", "Aedile", "Praetor", "Consul") #Position codes are the indexes here
+NO_POSITION = -1
+NEVER_CONSUL = np.iinfo(np.int32).min // 2 #last_consul for politicians who were never Consul, far enough in the past for any rule
+
+class Population:
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.next_id = 1 #Ids are handed out as ranges, names are only built when asked for
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.ages = np.empty(capacity, dtype=np.int32)
+        self.life = np.empty(capacity, dtype=np.float64)
+        self.service = np.empty(capacity, dtype=np.int32)
+        self.positions = np.empty(capacity, dtype=np.int8)
+        self.year_added = np.empty(capacity, dtype=np.int32)
+        self.last_consul = np.empty(capacity, dtype=np.int32)
+
+    FIELDS = ('ids', 'ages', 'life', 'service', 'positions', 'year_added', 'last_consul')
+
+    def __len__(self):
+        return self.size
+
+    #The live part of each array, these are views so writing into them changes the population
+    @property
+    def age(self):
+        return self.ages[:self.size]
+
+    @property
+    def life_expectancy(self):
+        return self.life[:self.size]
+
+    @property
+    def years_of_service(self):
+        return self.service[:self.size]
+
+    @property
+    def position(self):
+        return self.positions[:self.size]
+
+    @property
+    def added(self):
+        return self.year_added[:self.size]
+
+    @property
+    def consul_year(self):
+        return self.last_consul[:self.size]
+
+    @property
+    def id(self):
+        return self.ids[:self.size]
+
+    def name(self, index):
+        return f"Politician_{self.ids[index]}"
+
+    def reserve(self, extra):
+        #Making room for extra more politicians, doubling so that adding stays amortized O(1)
+        needed = self.size + extra
+        capacity = len(self.ages)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for field in self.FIELDS:
+            old = getattr(self, field)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, field, new)
+
+    def add(self, ages, life, year_added, positions=NO_POSITION):
+        #Adding a whole cohort at once, ages and life are arrays of the same length
+        n = len(ages)
+        self.reserve(n)
+        start, end = self.size, self.size + n
+        self.ids[start:end] = np.arange(self.next_id, self.next_id + n)
+        self.ages[start:end] = ages
+        self.life[start:end] = life
+        self.service[start:end] = 0
+        self.positions[start:end] = positions
+        self.year_added[start:end] = year_added
+        self.last_consul[start:end] = NEVER_CONSUL
+        self.size = end
+        self.next_id += n
+        return np.arange(start, end)
+
+    def keep(self, mask):
+        #Keeping only the politicians where mask is True, in place and in the same order
+        n = int(np.count_nonzero(mask))
+        for field in self.FIELDS:
+            arr = getattr(self, field)
+            arr[:n] = arr[:self.size][mask]
+        self.size = n
+
+    def counts(self):
+        #Number of politicians holding each office, in OFFICES order
+        held = self.position
+        return np.bincount(held[held >= 0], minlength=len(OFFICES))
+
+class CandidateIndex:
+    #Unassigned politicians bucketed by the highest minimum age they meet, so an election does not look at the whole pool
+    #Bucket t holds the rows that qualify for office t and every office below it, and the last office is split in two:
+    #rows that pass the extra check given to rebuild (e.g. the Consul 10 year rule) and rows that do not
+    def __init__(self, min_ages):
+        self.min_ages = np.asarray(min_ages) #Minimum age per office code, increasing
+        self.buckets = [[] for _ in range(len(self.min_ages) + 1)]
+
+    def rebuild(self, population, top_ok=None):
+        #Sorting the unassigned rows into buckets, once per year after the pool changed (one vectorized pass)
+        unassigned = population.position == NO_POSITION
+        tier = np.searchsorted(self.min_ages, population.age, side='right') - 1 #-1 means too young for anything
+        top = len(self.min_ages) - 1
+        for t in range(top):
+            self.buckets[t] = np.flatnonzero(unassigned & (tier == t)).tolist()
+        at_top = unassigned & (tier == top)
+        if top_ok is None:
+            self.buckets[top] = np.flatnonzero(at_top).tolist()
+            self.buckets[top + 1] = []
+        else:
+            self.buckets[top] = np.flatnonzero(at_top & top_ok).tolist()
+            self.buckets[top + 1] = np.flatnonzero(at_top & ~top_ok).tolist()
+
+    def count(self, first, last=None):
+        #Number of candidates in buckets first..last
+        return sum(len(b) for b in self.buckets[first:None if last is None else last + 1])
+
+    def draw(self, first, last, u):
+        #Removing and returning one uniformly random candidate from buckets first..last, or None if they are empty
+        #u is a uniform number in [0, 1), so the caller can draw them in bulk from its own generator
+        #A bucket is picked with probability proportional to its size, then a swap-remove takes the row out in O(1)
+        buckets = self.buckets[first:None if last is None else last + 1]
+        total = sum(len(b) for b in buckets)
+        if total == 0:
+            return None
+        r = int(u * total)
+        for bucket in buckets:
+            if r < len(bucket):
+                row = bucket[r]
+                bucket[r] = bucket[-1]
+                bucket.pop()
+                return row
+            r -= len(bucket)
+
+class ConsulCooldown:
+    #Politicians who were Consul less than `years` ago, with the year each one becomes eligible again
+    #Elections add to it and every year only the entries expiring that year are looked at
+    def __init__(self, years=10):
+        self.years = years
+        self.cooling = set() #Ids that can not be Consul yet
+        self.expiry = {} #Year -> ids whose cooldown ends that year
+
+    def elected(self, politician_id, year):
+        self.cooling.add(politician_id)
+        self.expiry.setdefault(year + self.years, []).append(politician_id)
+
+    def advance(self, year):
+        #Moving everybody whose cooldown ends this year back to the eligible side
+        for politician_id in self.expiry.pop(year, ()):
+            self.cooling.discard(politician_id)
+
+class OfficeLog:
+    #Optional append-only log of every election (politician id, office code, year), kept out of the yearly hot path
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.offices = np.empty(capacity, dtype=np.int8)
+        self.years = np.empty(capacity, dtype=np.int32)
+
+    def append(self, ids, office, year):
+        n = len(ids)
+        if self.size + n > len(self.ids):
+            capacity = max(2 * len(self.ids), self.size + n)
+            for field in ('ids', 'offices', 'years'):
+                old = getattr(self, field)
+                new = np.empty(capacity, dtype=old.dtype)
+                new[:self.size] = old[:self.size]
+                setattr(self, field, new)
+        self.ids[self.size:self.size + n] = ids
+        self.offices[self.size:self.size + n] = office
+        self.years[self.size:self.size + n] = year
+        self.size += n
+
+    def history(self, politician_id):
+        #Office name -> list of years, like the old Politician.office_history
+        rows = np.flatnonzero(self.ids[:self.size] == politician_id)
+        result = {}
+        for row in rows:
+            result.setdefault(OFFICES[self.offices[row]], []).append(int(self.years[row]))
+        return result
@@ -0,0 +1,50 @@
+#Optional timing counters for the simulators
+#They are only used when a profiler is attached: Simulation.run and ElectionSimulation.simulate_year check once per call
+#and switch to an instrumented path, so with no profiler the normal code runs unchanged
+import time
+
+class EventProfiler:
+    #For manufacturing.Simulation: events and time per event kind, and the largest event queue seen
+    def __init__(self, event_names):
+        self.event_names = event_names
+        self.counts = [0] * len(event_names)
+        self.seconds = [0.0] * len(event_names)
+        self.heap_high_water = 0
+        self.wall_seconds = 0.0
+
+    def report(self):
+        events = sum(self.counts)
+        return {
+            'events': events,
+            'wall_seconds': self.wall_seconds,
+            'events_per_sec': events / self.wall_seconds if self.wall_seconds > 0 else 0.0,
+            'heap_high_water': self.heap_high_water,
+            'per_event': {name: {'count': c, 'seconds': s, 'mean_us': s / c * 1e6 if c else 0.0}
+                          for name, c, s in zip(self.event_names, self.counts, self.seconds)},
+        }
+
+class PhaseProfiler:
+    #For ElectionSimulation: time per phase of a year, and the pool size at the end of every year
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+        self.pool_sizes = [] #One entry per simulated year, only kept while profiling
+        self.wall_seconds = 0.0
+
+    def timed(self, phase, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + time.perf_counter() - start
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+        return result
+
+    def report(self):
+        years = len(self.pool_sizes)
+        return {
+            'years': years,
+            'wall_seconds': self.wall_seconds,
+            'years_per_sec': years / self.wall_seconds if self.wall_seconds > 0 else 0.0,
+            'per_phase': {phase: {'calls': self.calls[phase], 'seconds': s} for phase, s in self.seconds.items()},
+            'pool_size_max': max(self.pool_sizes, default=0),
+            'pool_size_last': self.pool_sizes[-1] if self.pool_sizes else 0,
+        }
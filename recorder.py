@@ -0,0 +1,71 @@
+#Columnar results recorder for manufacturing.Simulation
+#Finished products are stored as one row in typed NumPy columns instead of one dict per product
+#Columns grow by doubling, and when a path is given they are written out in chunks so memory stays flat
+import numpy as np
+
+from tracing import restore_file
+
+class ResultsRecorder:
+    def __init__(self, num_stages=4, capacity=1024, path=None, chunk_size=100_000):
+        self.num_stages = num_stages
+        self.path = path #CSV file, if given the rows are flushed there every chunk_size rows
+        self.chunk_size = chunk_size
+        self.size = 0 #Rows currently held in memory
+        self.flushed = 0 #Rows already written to the file
+        self.header_written = False
+        self.file_size = 0 #Bytes written so far, used to cut the file back when a checkpoint is restored
+        #ReleaseTime is when the order entered the factory, StartTime when its first stage started
+        self.names = (['ProductID', 'ReleaseTime', 'StartTime', 'CompletionTime', 'Machine', 'Operator']
+                      + [f'Stage{i + 1}Time' for i in range(num_stages)])
+        dtypes = [np.int64, np.float64, np.float64, np.float64, np.int32, np.int32] + [np.float64] * num_stages
+        self.columns = [np.empty(capacity, dtype=d) for d in dtypes]
+
+    def __len__(self):
+        return self.flushed + self.size
+
+    def record(self, product_id, release_time, start_time, completion_time, machine_id, operator_id, stage_times):
+        if self.size == len(self.columns[0]):
+            self.grow()
+        i = self.size
+        cols = self.columns
+        cols[0][i] = product_id
+        cols[1][i] = release_time
+        cols[2][i] = start_time
+        cols[3][i] = completion_time
+        cols[4][i] = machine_id
+        cols[5][i] = operator_id
+        for stage, t in enumerate(stage_times):
+            cols[6 + stage][i] = t
+        self.size = i + 1
+        if self.path is not None and self.size >= self.chunk_size:
+            self.flush()
+
+    def grow(self):
+        #Doubling the capacity, so appending stays amortized O(1)
+        self.columns = [np.concatenate((c, np.empty_like(c))) for c in self.columns]
+
+    def flush(self):
+        #Writing the rows held in memory to the CSV file and starting over with the same buffers
+        if self.path is None or self.size == 0:
+            return
+        fmt = ['%d', '%.17g', '%.17g', '%.17g', '%d', '%d'] + ['%.17g'] * self.num_stages
+        with open(self.path, 'a' if self.header_written else 'w') as f:
+            np.savetxt(f, np.column_stack([c[:self.size] for c in self.columns]), delimiter=',', fmt=fmt,
+                       header='' if self.header_written else ','.join(self.names), comments='')
+            self.file_size = f.tell()
+        self.header_written = True
+        self.flushed += self.size
+        self.size = 0
+
+    def restore_output(self, path=None):
+        #Rows written after the checkpoint was taken would be written again when the run continues, so we drop them
+        #With a new path the rows up to the checkpoint are copied there instead and the old file is left alone
+        if self.path is not None and self.header_written:
+            restore_file(self.path, self.file_size, path)
+        if path is not None:
+            self.path = path
+
+    def view(self):
+        #Column name -> array slice of the rows still in memory, these are views, nothing is copied
+        #They are only valid until the next flush or grow, copy them if you need to keep them longer
+        return {name: col[:self.size] for name, col in zip(self.names, self.columns)}
@@ -0,0 +1,105 @@
+#Monte Carlo replications of manufacturing.Simulation
+#Every replication is an independent Simulation with its own seed, they are spread over a process pool
+#and the results are summarized with confidence intervals
+import math
+import os
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+
+from manufacturing import Simulation, Product
+
+def replication_seed(base_seed, index):
+    #Each replication gets its own seed, derived from the base seed, so the whole set can be reproduced
+    return base_seed * 2**32 + index
+
+def run_replication(params):
+    #Running one Simulation and returning only a small summary, so little data goes back to the parent process
+    num_machines, num_operators, shift_length, end_time, num_products, seed = params
+    sim = Simulation(num_machines, num_operators, shift_length, end_time, seed=seed)
+    for i in range(num_products):
+        sim.add_product(Product(i))
+    sim.run()
+    completion_times = sim.collect_data()['CompletionTime'].tolist()
+    finished = len(completion_times)
+    makespan = max(completion_times) if finished else float('nan')
+    return {
+        'seed': seed,
+        'finished': finished,
+        'throughput': finished / makespan * 60 if finished and makespan > 0 else 0.0, #Finished products per hour of work
+        'mean_completion_time': sum(completion_times) / finished if finished else float('nan'),
+        'makespan': makespan,
+    }
+
+def t_cdf(t, df):
+    #Student's t CDF for an integer df, from the exact finite series (Abramowitz and Stegun 26.7.3 and 26.7.4)
+    theta = math.atan(abs(t) / math.sqrt(df))
+    c2 = math.cos(theta) ** 2
+    if df % 2: #Odd df
+        term = total = 0.0
+        if df > 1:
+            term = total = math.cos(theta)
+            for k in range(3, df - 1, 2):
+                term *= c2 * (k - 1) / k
+                total += term
+        inside = 2 / math.pi * (theta + math.sin(theta) * total) #P(|T| < t)
+    else:
+        term = total = 1.0
+        for k in range(2, df - 1, 2):
+            term *= c2 * (k - 1) / k
+            total += term
+        inside = math.sin(theta) * total
+    return 0.5 + inside / 2 if t >= 0 else 0.5 - inside / 2
+
+def t_quantile(p, df):
+    #Student's t quantile, found by bisection on the exact CDF
+    if df <= 0 or not 0 < p < 1:
+        return float('nan')
+    if p < 0.5:
+        return -t_quantile(1 - p, df)
+    low, high = 0.0, 1.0
+    while t_cdf(high, df) < p:
+        high *= 2
+    for _ in range(100):
+        mid = (low + high) / 2
+        if t_cdf(mid, df) < p:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+def summarize(values, confidence=0.95):
+    #Mean, standard deviation and a confidence interval for the mean of one metric
+    values = [v for v in values if not math.isnan(v)]
+    n = len(values)
+    if n == 0:
+        return {'n': 0, 'mean': float('nan'), 'std': float('nan'), 'ci_low': float('nan'), 'ci_high': float('nan')}
+    mean = statistics.fmean(values)
+    std = statistics.stdev(values) if n > 1 else 0.0
+    half_width = t_quantile(0.5 + confidence / 2, n - 1) * std / math.sqrt(n) if n > 1 else float('inf')
+    return {'n': n, 'mean': mean, 'std': std, 'ci_low': mean - half_width, 'ci_high': mean + half_width}
+
+def run_replications(replications, num_machines, num_operators, shift_length, end_time, num_products,
+                     base_seed=0, workers=None, confidence=0.95):
+    #Running all replications over a process pool and aggregating the results
+    params = [(num_machines, num_operators, shift_length, end_time, num_products, replication_seed(base_seed, i))
+              for i in range(replications)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = [run_replication(p) for p in params]
+    else:
+        #Bigger chunks mean less pickling traffic between processes when replications are short
+        chunksize = max(1, replications // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_replication, params, chunksize=chunksize))
+    return {
+        'replications': results,
+        'throughput': summarize([r['throughput'] for r in results], confidence),
+        'mean_completion_time': summarize([r['mean_completion_time'] for r in results], confidence),
+        'makespan': summarize([r['makespan'] for r in results], confidence),
+    }
+
+if __name__ == "__main__":
+    summary = run_replications(100, num_machines=3, num_operators=10, shift_length=8 * 60, end_time=24 * 60, num_products=10)
+    for metric in ('throughput', 'mean_completion_time', 'makespan'):
+        s = summary[metric]
+        print(f"{metric}: mean = {s['mean']:.2f}, std = {s['std']:.2f}, 95% CI = [{s['ci_low']:.2f}, {s['ci_high']:.2f}]")
@@ -0,0 +1,68 @@
+#One random number service for every simulation in this repo, built on numpy.random.Generator
+#A RandomStream is created from one seed and can spawn independent child streams (per simulation, entity or replication),
+#so a whole run can be replayed from that seed. Scalar draws are served from blocks that are refilled in bulk,
+#which is much cheaper than one NumPy call per number
+import numpy as np
+
+class RandomStream:
+    def __init__(self, seed=None, block_size=4096):
+        #seed can be None, an int, a sequence of ints or a SeedSequence
+        self.seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.generator = np.random.default_rng(self.seed_seq)
+        self.block_size = block_size
+        #One buffer per distribution, kept as Python lists since indexing a list is faster than indexing an array
+        self.uniforms = []
+        self.u = 0
+        self.normals = []
+        self.n = 0
+        self.exponentials = []
+        self.e = 0
+
+    def spawn(self, count):
+        #Independent child streams, e.g. one per replication
+        return [RandomStream(child, self.block_size) for child in self.seed_seq.spawn(count)]
+
+    def random(self):
+        #Uniform number in [0, 1)
+        i = self.u
+        if i == len(self.uniforms):
+            self.uniforms = self.generator.random(self.block_size).tolist()
+            i = 0
+        self.u = i + 1
+        return self.uniforms[i]
+
+    def uniform(self, a, b):
+        return a + (b - a) * self.random()
+
+    def randint(self, a, b):
+        #Integer in [a, b], both ends included like random.randint
+        return a + int(self.random() * (b - a + 1))
+
+    def normal(self, mean=0.0, std=1.0):
+        i = self.n
+        if i == len(self.normals):
+            self.normals = self.generator.standard_normal(self.block_size).tolist()
+            i = 0
+        self.n = i + 1
+        return mean + std * self.normals[i]
+
+    def expovariate(self, rate):
+        #Exponential with the given rate, same meaning as random.expovariate
+        i = self.e
+        if i == len(self.exponentials):
+            self.exponentials = self.generator.standard_exponential(self.block_size).tolist()
+            i = 0
+        self.e = i + 1
+        return self.exponentials[i] / rate
+
+def as_generator(rng):
+    #A numpy Generator for bulk draws from a RandomStream, a Generator, or a seed
+    if isinstance(rng, RandomStream):
+        return rng.generator
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+def as_stream(rng):
+    #A RandomStream from a RandomStream or a seed
+    return rng if isinstance(rng, RandomStream) else RandomStream(rng)
@@ -0,0 +1,132 @@
+#Parameter sweeps for capacity planning with manufacturing.Simulation
+#Every (config, seed) run is cached on disk, keyed by the parameters, the seed and a hash of the simulation code,
+#so repeated or overlapping sweeps only run the cells they have not seen yet
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import replications
+from replications import run_replication, replication_seed, summarize
+
+PARAMETERS = ('num_machines', 'num_operators', 'shift_length', 'end_time', 'num_products')
+DEFAULTS = {'num_machines': 3, 'num_operators': 10, 'shift_length': 8 * 60, 'end_time': 24 * 60, 'num_products': 10}
+#Changing any of these files changes the results, so their contents are part of the cache key
+CODE_FILES = ('manufacturing.py', 'replications.py', 'arrivals.py', 'recorder.py', 'kpi.py', 'tracing.py', 'rng.py')
+
+def code_version():
+    digest = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(replications.__file__))
+    for name in CODE_FILES:
+        with open(os.path.join(here, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def expand_grid(grid):
+    #{'num_machines': [3, 5], 'num_operators': [10]} -> one dict per combination, missing parameters use DEFAULTS
+    unknown = set(grid) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    names = list(grid)
+    for values in itertools.product(*(grid[n] for n in names)):
+        config = dict(DEFAULTS)
+        config.update(zip(names, values))
+        yield config
+
+class ResultCache:
+    #One small JSON file per (config, seed, code version), in subfolders so no folder gets too big
+    def __init__(self, directory, version=None):
+        self.directory = directory
+        self.version = version or code_version()
+
+    def key(self, config, seed):
+        text = json.dumps([self.version, [config[p] for p in PARAMETERS], seed])
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.json')
+
+    def get(self, config, seed):
+        try:
+            with open(self.path(self.key(config, seed))) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, config, seed, result):
+        path = self.path(self.key(config, seed))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(result, f)
+        os.replace(tmp, path) #Two sweeps writing the same cell at once still leave a complete file
+
+def converged(summary, relative_half_width):
+    #A cell is done when the confidence interval is narrower than the given fraction of the mean
+    if summary['n'] < 2 or summary['mean'] == 0:
+        return False
+    return (summary['ci_high'] - summary['ci_low']) / 2 <= relative_half_width * abs(summary['mean'])
+
+def run_sweep(grid, cache_dir='.sweep_cache', base_seed=0, min_replications=5, max_replications=50, batch_size=5,
+              metric='throughput', relative_half_width=None, confidence=0.95, workers=None):
+    #Running every cell of the grid until its CI on metric is tight enough (if relative_half_width is given)
+    #or max_replications is reached, seeds are base_seed based so the same cell always gets the same seeds
+    cache = ResultCache(cache_dir)
+    cells = [{'config': config, 'results': []} for config in expand_grid(grid)]
+    active = list(cells)
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while active:
+            #One round: every active cell asks for its next batch of seeds, cached ones are answered right away
+            jobs = []
+            for cell in active:
+                done = len(cell['results'])
+                target = done + batch_size if done else min_replications
+                for i in range(done, min(target, max_replications)):
+                    seed = replication_seed(base_seed, i)
+                    cached = cache.get(cell['config'], seed)
+                    if cached is not None:
+                        cell['results'].append(cached)
+                    else:
+                        params = tuple(cell['config'][p] for p in PARAMETERS) + (seed,)
+                        jobs.append((cell, seed, params))
+            if jobs:
+                if pool is None:
+                    outputs = [run_replication(params) for _, _, params in jobs]
+                else:
+                    outputs = pool.map(run_replication, [params for _, _, params in jobs],
+                                       chunksize=max(1, len(jobs) // (workers * 4)))
+                for (cell, seed, _), result in zip(jobs, outputs):
+                    cache.put(cell['config'], seed, result)
+                    cell['results'].append(result)
+            still_active = []
+            for cell in active:
+                cell['results'].sort(key=lambda r: r['seed']) #Same order no matter what came from the cache
+                n = len(cell['results'])
+                if n >= max_replications:
+                    continue
+                if relative_half_width is not None and converged(summarize([r[metric] for r in cell['results']], confidence),
+                                                                 relative_half_width):
+                    continue
+                if relative_half_width is None and n >= min_replications:
+                    continue
+                still_active.append(cell)
+            active = still_active
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return [{
+        'config': cell['config'],
+        'replications': len(cell['results']),
+        'throughput': summarize([r['throughput'] for r in cell['results']], confidence),
+        'mean_completion_time': summarize([r['mean_completion_time'] for r in cell['results']], confidence),
+        'makespan': summarize([r['makespan'] for r in cell['results']], confidence),
+    } for cell in cells]
+
+if __name__ == "__main__":
+    grid = {'num_machines': [2, 3, 5], 'num_operators': [5, 10], 'num_products': [10, 50]}
+    for row in run_sweep(grid, relative_half_width=0.05):
+        t = row['throughput']
+        print(f"{row['config']}: {row['replications']} runs, throughput = {t['mean']:.2f} [{t['ci_low']:.2f}, {t['ci_high']:.2f}]")
@@ -0,0 +1,61 @@
+#A run that is checkpointed and resumed has to write exactly what an uninterrupted run writes
+import filecmp
+
+import arrivals
+import recorder
+import tracing
+from manufacturing import Simulation
+
+DAY = 60 * 24
+
+def build(tmp_path, tag):
+    tracer = tracing.Tracer(tracing.TRACE_EVENTS, path=str(tmp_path / f'trace_{tag}.csv'), batch_size=200)
+    results = recorder.ResultsRecorder(path=str(tmp_path / f'results_{tag}.csv'), chunk_size=100)
+    sim = Simulation(5, 12, 480, DAY * 5, seed=7, tracer=tracer, recorder=results, track_kpis=True)
+    sim.add_arrivals(arrivals.PoissonArrivals(0.5))
+    return sim
+
+def finish(sim):
+    sim.run()
+    sim.tracer.close()
+    sim.recorder.flush()
+    return sim
+
+def same_output(tmp_path, a, b):
+    return (filecmp.cmp(tmp_path / f'results_{a}.csv', tmp_path / f'results_{b}.csv', shallow=False)
+            and filecmp.cmp(tmp_path / f'trace_{a}.csv', tmp_path / f'trace_{b}.csv', shallow=False))
+
+def test_resume_matches_uninterrupted_run(tmp_path):
+    full = finish(build(tmp_path, 'full'))
+    crashed = build(tmp_path, 'resumed')
+    crashed.run(until=DAY * 2)
+    crashed.save_checkpoint(str(tmp_path / 'sim.ckpt'))
+    crashed.run(until=DAY * 3) #Output written after the checkpoint has to be dropped on restore
+    resumed = finish(Simulation.load_checkpoint(str(tmp_path / 'sim.ckpt')))
+    assert resumed.clock == full.clock
+    assert len(resumed.recorder) == len(full.recorder)
+    assert same_output(tmp_path, 'full', 'resumed')
+    assert resumed.kpi_report() == full.kpi_report()
+
+def test_forks_get_their_own_files(tmp_path):
+    full = finish(build(tmp_path, 'full'))
+    original = build(tmp_path, 'original')
+    original.run(until=DAY * 2)
+    original.save_checkpoint(str(tmp_path / 'sim.ckpt'))
+    original.tracer.flush()
+    sizes = ((tmp_path / 'results_original.csv').stat().st_size, (tmp_path / 'trace_original.csv').stat().st_size)
+    for tag in ('fork1', 'fork2'):
+        fork = Simulation.load_checkpoint(str(tmp_path / 'sim.ckpt'), recorder_path=str(tmp_path / f'results_{tag}.csv'),
+                                          trace_path=str(tmp_path / f'trace_{tag}.csv'))
+        finish(fork)
+        assert same_output(tmp_path, 'full', tag)
+        assert fork.kpi_report() == full.kpi_report()
+    assert sizes == ((tmp_path / 'results_original.csv').stat().st_size, (tmp_path / 'trace_original.csv').stat().st_size)
+
+def test_run_with_checkpoints_matches_uninterrupted_run(tmp_path):
+    full = finish(build(tmp_path, 'full'))
+    checkpointed = build(tmp_path, 'checkpointed')
+    checkpointed.run_with_checkpoints(str(tmp_path / 'sim.ckpt'), DAY / 2)
+    finish(checkpointed)
+    assert same_output(tmp_path, 'full', 'checkpointed')
+    assert checkpointed.kpi_report() == full.kpi_report()
@@ -0,0 +1,57 @@
+#CandidateIndex has to give every candidate the same chance, whatever bucket they are in
+import numpy as np
+
+from population import CandidateIndex, Population, NO_POSITION
+
+MIN_AGES = (30, 36, 39, 42)
+
+def make_pool():
+    #100 candidates for Quaestor only, 50 up to Aedile, 30 up to Praetor, 20 old enough for Consul,
+    #plus 10 too young for anything and 10 who already hold an office
+    ages = [30] * 100 + [37] * 50 + [40] * 30 + [45] * 20 + [25] * 10 + [45] * 10
+    pool = Population()
+    pool.add(np.array(ages), np.full(len(ages), 80.0), 0)
+    pool.position[-10:] = 0
+    top_ok = np.zeros(len(ages), dtype=bool)
+    top_ok[180:188] = True #8 of the Consul-age candidates pass the 10 year rule, 12 do not
+    return pool, top_ok
+
+def test_buckets_and_consul_split():
+    pool, top_ok = make_pool()
+    index = CandidateIndex(MIN_AGES)
+    index.rebuild(pool, top_ok)
+    assert [len(b) for b in index.buckets] == [100, 50, 30, 8, 12]
+    assert index.count(3, 3) == 8
+    assert index.count(3) == 20
+    assert index.count(0) == 200
+
+def test_draws_are_uniform():
+    pool, top_ok = make_pool()
+    index = CandidateIndex(MIN_AGES)
+    rng = np.random.default_rng(42)
+    trials = 40_000
+    hits = np.zeros(len(pool), dtype=np.int64)
+    for u in rng.random(trials):
+        index.rebuild(pool, top_ok)
+        hits[index.draw(0, None, u)] += 1
+    assert hits[200:].sum() == 0 #Too young or already in office
+    expected = trials / 200
+    chi2 = ((hits[:200] - expected) ** 2 / expected).sum()
+    assert chi2 < 280 #199 degrees of freedom, about the 99.9% point
+    #Shares per bucket, against the bucket sizes
+    shares = np.add.reduceat(hits[:200], [0, 100, 150, 180]) / trials
+    assert np.allclose(shares, [0.5, 0.25, 0.15, 0.1], atol=0.01)
+
+def test_consul_draws_honour_the_split():
+    pool, top_ok = make_pool()
+    index = CandidateIndex(MIN_AGES)
+    rng = np.random.default_rng(3)
+    index.rebuild(pool, top_ok)
+    drawn = [index.draw(3, 3, u) for u in rng.random(10)]
+    assert sorted(drawn[:8]) == list(range(180, 188)) #Only rows that pass the rule, each one once
+    assert drawn[8:] == [None, None]
+    #Without the rule the other Consul-age candidates are drawn too, and never anyone younger
+    index.rebuild(pool, top_ok)
+    drawn = [index.draw(3, None, u) for u in rng.random(20)]
+    assert sorted(drawn) == list(range(180, 200))
+    assert all(pool.position[row] == NO_POSITION for row in drawn)
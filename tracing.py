@@ -0,0 +1,132 @@
+#Leveled event tracing for manufacturing.Simulation, used instead of printing every event
+#Records are small tuples (time, code, product_id, machine_id, operator_id), they are only turned into text when someone reads them
+import csv
+import os
+from collections import deque
+
+#Trace levels
+TRACE_OFF = 0 #Nothing is recorded
+TRACE_SUMMARY = 1 #Only finished products, machine failures and maintenance
+TRACE_EVENTS = 2 #Every single event
+
+#Record codes and the level they belong to
+START = 0
+WAIT = 1
+END = 2
+FINISHED = 3
+FAILED = 4
+FAILURE_HANDLED = 5
+MAINTENANCE = 6
+
+MESSAGES = (
+    "Starting process for Product {product} at time {time} on Machine {machine} with Operator {operator}",
+    "No available machine or operator for Product {product} at time {time}",
+    "Ending process for Product {product} at time {time} on Machine {machine} with Operator {operator}",
+    "Product {product} finished at time {time}",
+    "Machine {machine} failed at time {time}",
+    "Handling failure for Machine {machine} at time {time}",
+    "Performing maintenance on Machine {machine} at time {time}",
+)
+
+def restore_file(source, size, target=None):
+    #Bringing an output file back to the size it had at a checkpoint
+    #Without a target the file is cut back in place, with one the first size bytes are copied there and source is left alone
+    if target is None or os.path.abspath(target) == os.path.abspath(source):
+        if os.path.exists(source):
+            os.truncate(source, size)
+        return
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        while size > 0:
+            chunk = src.read(min(size, 1 << 20))
+            if not chunk:
+                break
+            dst.write(chunk)
+            size -= len(chunk)
+
+def format_record(record):
+    #Turning one record back into the message the simulation used to print
+    time, code, product, machine, operator = record
+    return MESSAGES[code].format(time=time, product=product, machine=machine, operator=operator)
+
+class Tracer:
+    def __init__(self, level=TRACE_EVENTS, capacity=100_000, path=None, batch_size=10_000, echo=False):
+        self.level = level
+        self.buffer = deque(maxlen=capacity) #Ring buffer, we only keep the most recent records in memory
+        self.echo = echo #If True, every record is printed as soon as it is recorded, like the old print() calls
+        self.path = path #Optional CSV file where all records are written in batches
+        self.batch_size = batch_size
+        self.pending = []
+        self.file = None
+        self.writer = None
+        self.file_size = 0 #Bytes written so far, used to cut the file back when a checkpoint is restored
+
+    def record(self, time, code, product=None, machine=None, operator=None):
+        rec = (time, code, product, machine, operator)
+        self.buffer.append(rec)
+        if self.path is not None:
+            self.pending.append(rec)
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+        if self.echo:
+            print(format_record(rec))
+
+    def flush(self):
+        #Writing the pending records to the CSV file in one go
+        if self.path is None or not self.pending:
+            return
+        if self.writer is None:
+            if self.file_size == 0:
+                self.file = open(self.path, 'w', newline='')
+                self.writer = csv.writer(self.file)
+                self.writer.writerow(['time', 'code', 'product', 'machine', 'operator'])
+            else: #Continuing a file after a checkpoint was restored
+                self.file = open(self.path, 'a', newline='')
+                self.writer = csv.writer(self.file)
+        self.writer.writerows(self.pending)
+        self.pending.clear()
+        self.file.flush()
+        self.file_size = self.file.tell()
+
+    def close(self):
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.writer = None
+
+    def __getstate__(self):
+        #Open files can not be pickled, the file is opened again on the next flush, see restore_output
+        state = self.__dict__.copy()
+        state['file'] = None
+        state['writer'] = None
+        return state
+
+    def restore_output(self, path=None):
+        #Called after a checkpoint is loaded: records written after the checkpoint would be written again, so they are dropped
+        #With a new path the file up to the checkpoint is copied there, so several runs can continue from one checkpoint
+        if self.path is not None and self.file_size:
+            restore_file(self.path, self.file_size, path)
+        if path is not None:
+            self.path = path
+
+    def replay(self, product=None, machine=None, operator=None, records=None):
+        #Giving back formatted messages, optionally only the ones about one product, machine or operator
+        #records can be given to replay something else than the ring buffer, e.g. read_trace(path)
+        for rec in (self.buffer if records is None else records):
+            if product is not None and rec[2] != product:
+                continue
+            if machine is not None and rec[3] != machine:
+                continue
+            if operator is not None and rec[4] != operator:
+                continue
+            yield format_record(rec)
+
+def read_trace(path):
+    #Reading records back from a CSV file written by a Tracer
+    def value(text, convert):
+        return convert(text) if text != '' else None
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for time, code, product, machine, operator in reader:
+            yield (float(time), int(code), value(product, int), value(machine, int), value(operator, int))